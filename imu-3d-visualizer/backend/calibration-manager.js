@@ -1,5 +1,6 @@
 // backend/calibration-manager.js
-const math = require('mathjs');
+
+const RAD_TO_DEG = 180 / Math.PI;
 
 class CalibrationManager {
   constructor() {
@@ -16,8 +17,17 @@ class CalibrationManager {
     console.log(`📐 Storing calibration for client ${clientId}`);
     this.calibrations.set(clientId, {
       smpl2imu: calibrationData.smpl2imu,
+      // Quaternion form of smpl2imu, so packets are composed without matrix products
+      smpl2imuQuat: calibrationData.smpl2imu
+        ? this.normalizeQuaternion(this.rotationMatrixToQuaternion(calibrationData.smpl2imu))
+        : null,
       referenceDeviceId: calibrationData.referenceDeviceId,
       referenceWorldQuat: calibrationData.referenceWorldQuat,
+      // Inverse of the reference quaternion, computed once instead of per packet
+      // (normalized first, so the conjugate is an exact inverse)
+      referenceWorldQuatInverse: calibrationData.referenceWorldQuat
+        ? this.inverseQuaternion(this.normalizeQuaternion(calibrationData.referenceWorldQuat))
+        : null,
       device2boneMatrices: {},
       timestamp: Date.now()
     });
@@ -34,10 +44,43 @@ class CalibrationManager {
     
     if (calibration) {
       calibration.device2boneMatrices = tposeData.device2boneMatrices;
+      calibration.device2boneQuatByIndex = this.indexDevice2BoneMatrices(tposeData.device2boneMatrices);
       calibration.isTPoseCalibrated = true;
     }
   }
 
+  /**
+   * Re-key device2bone rotations by device index for per-packet lookups
+   * Matrices arrive keyed by "<device_name>_<device_id>"; indexing them by
+   * device id (then name) avoids building that key string for every packet.
+   * Each matrix is stored as a quaternion, converted once here instead of
+   * on every packet
+   * @param {Object} device2boneMatrices - Matrices keyed by device key
+   * @returns {Array} Per-device-id objects mapping device name to quaternion
+   */
+  indexDevice2BoneMatrices(device2boneMatrices) {
+    const byIndex = [];
+    
+    Object.entries(device2boneMatrices || {}).forEach(([deviceKey, matrix]) => {
+      const separator = deviceKey.lastIndexOf('_');
+      const deviceName = deviceKey.slice(0, separator);
+      const idStr = deviceKey.slice(separator + 1);
+      const deviceId = Number(idStr);
+      
+      // Device ids are small non-negative integers; other keys can never match
+      if (separator < 0 || !Number.isInteger(deviceId) || deviceId < 0 || String(deviceId) !== idStr) {
+        return;
+      }
+      
+      if (!byIndex[deviceId]) {
+        byIndex[deviceId] = {};
+      }
+      byIndex[deviceId][deviceName] = this.normalizeQuaternion(this.rotationMatrixToQuaternion(matrix));
+    });
+    
+    return byIndex;
+  }
+
   /**
    * Remove calibration for a client
    * @param {string} clientId 
@@ -66,30 +109,33 @@ class CalibrationManager {
       // - Identity = device laying flat, screen up
       // - Our world frame is defined when device is vertical, screen facing away
       
-      // Get device2bone matrix if T-pose calibrated
-      const deviceKey = `${deviceData.device_name}_${deviceData.device_id}`;
-      const device2bone = calibration.device2boneMatrices?.[deviceKey];
+      // Get device2bone quaternion if T-pose calibrated
+      const device2boneQuat = calibration.device2boneQuatByIndex?.[deviceData.device_id]?.[deviceData.device_name];
       
-      // Calculate world frame quaternion
-      const rotMatrix = this.quaternionToRotationMatrix(deviceData.quaternion);
-      let worldRotMatrix = math.multiply(calibration.smpl2imu, rotMatrix);
+      // Calculate world frame quaternion by composing quaternions directly
+      // (smpl2imu * device * device2bone) instead of multiplying rotation
+      // matrices and converting the result back
+      // For acceleration, we only use smpl2imu * device (not device2bone)
+      const accTransformQuat = this.quaternionMultiply(calibration.smpl2imuQuat, deviceData.quaternion);
+      let worldQuaternion = accTransformQuat;
       
       // Apply device2bone transformation if available (T-pose calibrated)
-      if (device2bone) {
-        worldRotMatrix = math.multiply(worldRotMatrix, device2bone);
+      if (device2boneQuat) {
+        worldQuaternion = this.quaternionMultiply(worldQuaternion, device2boneQuat);
       }
       
-      const worldQuaternion = this.rotationMatrixToQuaternion(worldRotMatrix);
+      // Canonicalise to a non-negative scalar part; q and -q are the same rotation
+      if (worldQuaternion[3] < 0) {
+        worldQuaternion = [-worldQuaternion[0], -worldQuaternion[1], -worldQuaternion[2], -worldQuaternion[3]];
+      }
       
       // Calculate world frame accelerometer
-      // For acceleration, we only use smpl2imu * rotMatrix (not device2bone)
-      const accTransformMatrix = math.multiply(calibration.smpl2imu, rotMatrix);
-      const worldAccelerometer = math.multiply(accTransformMatrix, deviceData.accelerometer);
+      const worldAccelerometer = this.rotateVector(accTransformQuat, deviceData.accelerometer);
       
       // Calculate world frame linear acceleration if available
       let worldLinearAcceleration;
       if (deviceData.linear_acceleration) {
-        worldLinearAcceleration = math.multiply(accTransformMatrix, deviceData.linear_acceleration);
+        worldLinearAcceleration = this.rotateVector(accTransformQuat, deviceData.linear_acceleration);
       }
       
       // Calculate world frame Euler angles
@@ -108,7 +154,7 @@ class CalibrationManager {
       const worldFrameQuatForViz = this.getVisualizationQuaternion(
         worldQuaternion, 
         deviceData.device_name,
-        calibration.referenceWorldQuat
+        calibration.referenceWorldQuatInverse
       );
       
       // Add world frame data to device data
@@ -129,27 +175,25 @@ class CalibrationManager {
   }
 
   /**
-   * Convert quaternion to rotation matrix
+   * Rotate a 3D vector by a unit quaternion: q * v * q^-1
+   * Uses v' = v + w*t + q_xyz x t with t = 2 * (q_xyz x v), which needs no
+   * intermediate rotation matrix
+   * @param {Array} q - Quaternion [x, y, z, w]
+   * @param {Array} v - Vector [x, y, z]
+   * @returns {Array} Rotated vector
    */
-  quaternionToRotationMatrix(q) {
+  rotateVector(q, v) {
     const [x, y, z, w] = q;
+    const [vx, vy, vz] = v;
     
-    const xx = x * x;
-    const xy = x * y;
-    const xz = x * z;
-    const xw = x * w;
-    
-    const yy = y * y;
-    const yz = y * z;
-    const yw = y * w;
-    
-    const zz = z * z;
-    const zw = z * w;
+    const tx = 2 * (y * vz - z * vy);
+    const ty = 2 * (z * vx - x * vz);
+    const tz = 2 * (x * vy - y * vx);
     
     return [
-      [1 - 2 * (yy + zz), 2 * (xy - zw), 2 * (xz + yw)],
-      [2 * (xy + zw), 1 - 2 * (xx + zz), 2 * (yz - xw)],
-      [2 * (xz - yw), 2 * (yz + xw), 1 - 2 * (xx + yy)]
+      vx + w * tx + (y * tz - z * ty),
+      vy + w * ty + (z * tx - x * tz),
+      vz + w * tz + (x * ty - y * tx)
     ];
   }
 
@@ -198,7 +242,7 @@ class CalibrationManager {
     // Roll (x-axis rotation)
     const sinr_cosp = 2 * (w * x + y * z);
     const cosr_cosp = 1 - 2 * (x * x + y * y);
-    const roll = Math.atan2(sinr_cosp, cosr_cosp) * 180 / Math.PI;
+    const roll = Math.atan2(sinr_cosp, cosr_cosp) * RAD_TO_DEG;
 
     // Pitch (y-axis rotation)
     const sinp = 2 * (w * y - z * x);
@@ -206,13 +250,13 @@ class CalibrationManager {
     if (Math.abs(sinp) >= 1) {
       pitch = Math.sign(sinp) * 90;
     } else {
-      pitch = Math.asin(sinp) * 180 / Math.PI;
+      pitch = Math.asin(sinp) * RAD_TO_DEG;
     }
 
     // Yaw (z-axis rotation)
     const siny_cosp = 2 * (w * z + x * y);
     const cosy_cosp = 1 - 2 * (y * y + z * z);
-    const yaw = Math.atan2(siny_cosp, cosy_cosp) * 180 / Math.PI;
+    const yaw = Math.atan2(siny_cosp, cosy_cosp) * RAD_TO_DEG;
 
     return [roll, pitch, yaw];
   }
@@ -228,13 +272,10 @@ class CalibrationManager {
    * Calculate visualization quaternion with device-specific transforms
    * @param {Array} worldQuaternion - World frame quaternion [x, y, z, w]
    * @param {string} deviceName - Device name for specific transforms
-   * @param {Array} referenceQuat - Reference quaternion from calibration
+   * @param {Array} refQuatInverse - Inverse of the reference quaternion from calibration
    * @returns {Array} Visualization quaternion [x, y, z, w]
    */
-  getVisualizationQuaternion(worldQuaternion, deviceName, referenceQuat) {
-    // First, calculate the inverse of the reference quaternion
-    const refQuatInverse = this.inverseQuaternion(referenceQuat);
-    
+  getVisualizationQuaternion(worldQuaternion, deviceName, refQuatInverse) {
     // Multiply worldQuaternion by inverse of reference quaternion
     // This gives us the relative rotation from the calibration moment
     const relativeQuat = this.quaternionMultiply(refQuatInverse, worldQuaternion);
@@ -254,6 +295,21 @@ class CalibrationManager {
     return [-q[0], -q[1], -q[2], q[3]];
   }
 
+  /**
+   * Scale a quaternion to unit length
+   * Calibration quaternions are normalized once when stored, so the
+   * per-packet path can use conjugates as inverses without dividing
+   * @param {Array} q - Quaternion [x, y, z, w]
+   * @returns {Array} Unit quaternion (identity if q has zero length)
+   */
+  normalizeQuaternion(q) {
+    const length = Math.sqrt(q[0] * q[0] + q[1] * q[1] + q[2] * q[2] + q[3] * q[3]);
+    if (!(length > 0)) {
+      return [0, 0, 0, 1];
+    }
+    return [q[0] / length, q[1] / length, q[2] / length, q[3] / length];
+  }
+
   /**
    * Multiply two quaternions: q1 * q2
    * @param {Array} q1 - First quaternion [x, y, z, w]
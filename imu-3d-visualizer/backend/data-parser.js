@@ -3,6 +3,109 @@
  * Converted from Python sensor_utils.py parsing functions
  */
 
+// Shared gyroscope value for devices without one (frozen so it can be reused)
+const ZERO_VECTOR3 = Object.freeze([0.0, 0.0, 0.0]);
+
+// Device index mapping for compatibility with Python code
+const DEVICE_INDICES = {
+  'phone': 0,
+  'iphone': 0,
+  'watch': 1,
+  'applewatch': 1,
+  'headphone': 2,
+  'airpods': 2,
+  'glasses': 2,
+  'arglasses': 2
+};
+
+// Per-device layout of iOS data values after the common
+// timestamps (0-1), accelerometer (2-4) and quaternion (5-8) fields.
+// Only Apple Watch sends real gyroscope data:
+//   Apple Watch: timestamp device_timestamp ax ay az qx qy qz qw gx gy gz
+//   iPhone:      timestamp device_timestamp ax ay az qx qy qz qw roll pitch yaw
+//   AirPods:     timestamp device_timestamp ax ay az qx qy qz qw
+const IOS_DEVICE_LAYOUTS = {
+  'watch': Object.freeze({ gyroOffset: 9 })
+};
+const DEFAULT_IOS_LAYOUT = Object.freeze({ gyroOffset: -1 });
+
+// Each kind of malformed-packet warning is logged on its first occurrence and
+// then once per WARN_EVERY, so a misbehaving sender cannot flood the console
+// and a flood of one kind cannot hide the first occurrence of another
+const WARN_EVERY = 1000;
+const malformedCounts = new Map(); // format string -> occurrences
+
+/**
+ * Log a malformed packet warning, throttled per format string
+ * Takes a console format string and its arguments so that nothing is
+ * formatted for the warnings that are skipped
+ * @param {string} format - Warning format string (%d, %s placeholders)
+ * @param {...*} args - Format arguments
+ */
+function warnMalformed(format, ...args) {
+  const count = malformedCounts.get(format) || 0;
+  if (count % WARN_EVERY === 0) {
+    console.warn(format + ' (%d so far)', ...args, count + 1);
+  }
+  malformedCounts.set(format, count + 1);
+}
+
+/**
+ * Parse whitespace-separated numeric fields in a single pass
+ * Avoids the intermediate token array of trim() + split(/\s+/)
+ * 
+ * @param {string} str - String of numeric fields
+ * @param {boolean} keepInvalid - Keep non-finite values (as parsed) so token
+ *   positions are preserved; when false they are dropped
+ * @returns {number[]} Parsed values
+ */
+function parseNumericFields(str, keepInvalid = true) {
+  const values = [];
+  const length = str.length;
+  let i = 0;
+
+  while (i < length) {
+    // Skip separators (space, \t, \n, \v, \f, \r)
+    let code = str.charCodeAt(i);
+    if (code === 32 || (code >= 9 && code <= 13)) {
+      i++;
+      continue;
+    }
+
+    const start = i;
+    do {
+      i++;
+      code = str.charCodeAt(i);
+    } while (i < length && code !== 32 && (code < 9 || code > 13));
+
+    const value = parseFloat(str.slice(start, i));
+    if (keepInvalid || isFinite(value)) {
+      values.push(value);
+    }
+  }
+
+  return values;
+}
+
+/**
+ * Create a parsed sample record
+ * Both parsers build their result here so every sample has the same shape
+ * 
+ * @returns {Object} Parsed data object
+ */
+function createParsedSample(deviceId, deviceName, timestamps, accelerometer, quaternion, gyroscope, hasGyro, rawMessage) {
+  return {
+    device_id: deviceId,
+    device_name: deviceName,
+    timestamps: timestamps,
+    accelerometer: accelerometer,
+    quaternion: quaternion,
+    gyroscope: gyroscope,
+    has_gyro: hasGyro,
+    raw_message: rawMessage
+  };
+}
+
 /**
  * Parse iOS sensor message format
  * Expected format: "device_id;device_type:timestamp1 timestamp2 ax ay az qx qy qz qw [gx gy gz]"
@@ -14,43 +117,43 @@ function parseIOSMessage(message) {
   try {
     message = message.trim();
     
-    // Check basic format requirements
-    if (!message || !message.includes(';') || !message.includes(':')) {
+    if (!message) {
       return null;
     }
 
-    // Split device info and data
-    const parts = message.split(';', 2);
-    if (parts.length !== 2) {
+    // Locate the separators with one scan each instead of includes() + split().
+    // Only the segment between the first and second ';' is used, and within it
+    // the data runs from the first ':' up to the next ':' (if any).
+    const idEnd = message.indexOf(';');
+    if (idEnd < 0) {
       return null;
     }
 
-    const deviceIdStr = parts[0];
-    const rawDataStr = parts[1];
+    let segmentEnd = message.indexOf(';', idEnd + 1);
+    if (segmentEnd < 0) {
+      segmentEnd = message.length;
+    }
 
-    // Split device type and numeric data
-    const dataParts = rawDataStr.split(':', 2);
-    if (dataParts.length !== 2) {
+    const typeEnd = message.indexOf(':', idEnd + 1);
+    if (typeEnd < 0 || typeEnd >= segmentEnd) {
       return null;
     }
 
-    const deviceType = dataParts[0].toLowerCase();
-    const dataStr = dataParts[1];
-
-    // Parse numeric values
-    const dataValues = [];
-    const valueStrings = dataStr.trim().split(/\s+/);
-    
-    for (const valueStr of valueStrings) {
-      const value = parseFloat(valueStr);
-      if (!isNaN(value) && isFinite(value)) {
-        dataValues.push(value);
-      }
+    let dataEnd = message.indexOf(':', typeEnd + 1);
+    if (dataEnd < 0 || dataEnd > segmentEnd) {
+      dataEnd = segmentEnd;
     }
 
+    const deviceIdStr = message.slice(0, idEnd);
+    const deviceType = message.slice(idEnd + 1, typeEnd).toLowerCase();
+    const dataStr = message.slice(typeEnd + 1, dataEnd);
+
+    // Parse numeric values (non-numeric fields are skipped)
+    const dataValues = parseNumericFields(dataStr, false);
+
     // Need at least 2 timestamps + 3 accel + 4 quat = 9 values
     if (dataValues.length < 9) {
-      console.warn(`Insufficient iOS data values: got ${dataValues.length}, need at least 9`);
+      warnMalformed('Insufficient iOS data values: got %d, need at least 9', dataValues.length);
       return null;
     }
 
@@ -59,30 +162,15 @@ function parseIOSMessage(message) {
     const accelerometer = dataValues.slice(2, 5);
     const quaternion = dataValues.slice(5, 9);
     
-    // Determine if device has gyroscope data - only Apple Watch sends real gyroscope data
-    // Apple Watch format: timestamp device_timestamp ax ay az qx qy qz qw gx gy gz
-    // iPhone format: timestamp device_timestamp ax ay az qx qy qz qw roll pitch yaw
-    // AirPods format: timestamp device_timestamp ax ay az qx qy qz qw
-    let hasGyro = false;
-    let gyroscope = [0.0, 0.0, 0.0];
-    
-    if (deviceType === 'watch' && dataValues.length >= 12) {
-      // Apple Watch has gyroscope data in positions 9-11
-      hasGyro = true;
-      gyroscope = dataValues.slice(9, 12);
-    }
-    // For iPhone and AirPods, we'll keep the default values (zeros and hasGyro=false)
-
-    return {
-      device_id: deviceIdStr,
-      device_name: deviceType,
-      timestamps: timestamps,
-      accelerometer: accelerometer,
-      quaternion: quaternion,
-      gyroscope: gyroscope,
-      has_gyro: hasGyro,
-      raw_message: message
-    };
+    // Gyroscope position comes from the device layout table
+    const layout = IOS_DEVICE_LAYOUTS[deviceType] || DEFAULT_IOS_LAYOUT;
+    const gyroOffset = layout.gyroOffset;
+    const hasGyro = gyroOffset >= 0 && dataValues.length >= gyroOffset + 3;
+    const gyroscope = hasGyro ? dataValues.slice(gyroOffset, gyroOffset + 3) : ZERO_VECTOR3;
+
+    return createParsedSample(
+      deviceIdStr, deviceType, timestamps, accelerometer, quaternion, gyroscope, hasGyro, message
+    );
 
   } catch (error) {
     console.error('Error parsing iOS message:', error);
@@ -99,74 +187,76 @@ function parseIOSMessage(message) {
  */
 function parseARGlassesMessage(message) {
   try {
-    const parts = message.trim().split(/\s+/);
-    
-    // Need at least timestamp + device_timestamp + 4 quat + 3 accel = 9 values
-    if (parts.length < 9) {
-      console.warn(`AR glasses data format error: expected at least 9 values, got ${parts.length}`);
-      return null;
-    }
+    return createARGlassesSample(parseNumericFields(message), message);
+  } catch (error) {
+    console.error('Error parsing AR glasses message:', error);
+    return null;
+  }
+}
 
-    // Parse components
-    const timestamp = parseFloat(parts[0]);
-    const deviceTimestamp = parseFloat(parts[1]);
+/**
+ * Build an AR glasses sample from already parsed numeric fields
+ * Lets a caller that has parsed the fields to classify a message reuse
+ * them instead of parsing the message again
+ * 
+ * @param {number[]} values - Fields from parseNumericFields(message)
+ * @param {string} message - Raw AR glasses message string
+ * @returns {Object|null} Parsed data object or null if the values are invalid
+ */
+function createARGlassesSample(values, message) {
+  // Need at least timestamp + device_timestamp + 4 quat + 3 accel = 9 values
+  if (values.length < 9) {
+    warnMalformed('AR glasses data format error: expected at least 9 values, got %d', values.length);
+    return null;
+  }
 
-    // Validate timestamps
-    if (isNaN(timestamp) || isNaN(deviceTimestamp)) {
-      console.warn('Invalid timestamps in AR glasses data');
-      return null;
-    }
+  // Parse components
+  const timestamp = values[0];
+  const deviceTimestamp = values[1];
 
-    // Quaternion (x, y, z, w format from Unity)
-    const quaternion = [];
-    for (let i = 2; i < 6; i++) {
-      const value = parseFloat(parts[i]);
-      if (isNaN(value)) {
-        console.warn(`Invalid quaternion value at index ${i}`);
-        return null;
-      }
-      quaternion.push(value);
-    }
+  // Validate timestamps
+  if (isNaN(timestamp) || isNaN(deviceTimestamp)) {
+    warnMalformed('Invalid timestamps in AR glasses data');
+    return null;
+  }
 
-    // Acceleration
-    const accelerometer = [];
-    for (let i = 6; i < 9; i++) {
-      const value = parseFloat(parts[i]);
-      if (isNaN(value)) {
-        console.warn(`Invalid accelerometer value at index ${i}`);
-        return null;
-      }
-      accelerometer.push(value);
+  // Quaternion (x, y, z, w format from Unity) and acceleration are validated
+  // in place, then sliced out of the parsed values in one copy each
+  for (let i = 2; i < 9; i++) {
+    if (isNaN(values[i])) {
+      warnMalformed(i < 6 ? 'Invalid quaternion value at index %d' : 'Invalid accelerometer value at index %d', i);
+      return null;
     }
+  }
+  const quaternion = values.slice(2, 6);
+  const accelerometer = values.slice(6, 9);
 
-    // Determine if AR glasses have gyroscope data (need 12+ values)
-    const hasGyro = parts.length >= 12;
-    
-    // Gyroscope if available
-    const gyroscope = [0.0, 0.0, 0.0];
-    if (hasGyro) {
-      for (let i = 9; i < 12; i++) {
-        const value = parseFloat(parts[i]);
-        if (!isNaN(value)) {
-          gyroscope[i - 9] = value;
-        }
-      }
-    }
+  // Determine if AR glasses have gyroscope data (need 12+ values)
+  const hasGyro = values.length >= 12;
+  
+  // Gyroscope if available (invalid components fall back to 0)
+  const gyroscope = hasGyro
+    ? [values[9] || 0.0, values[10] || 0.0, values[11] || 0.0]
+    : ZERO_VECTOR3;
 
-    return {
-      device_name: 'glasses',
-      timestamps: [timestamp, deviceTimestamp],
-      accelerometer: accelerometer,
-      quaternion: quaternion,
-      gyroscope: gyroscope,
-      has_gyro: hasGyro,
-      raw_message: message
-    };
+  // AR glasses messages carry no device id
+  return createParsedSample(
+    null, 'glasses', [timestamp, deviceTimestamp], accelerometer, quaternion, gyroscope, hasGyro, message
+  );
+}
 
-  } catch (error) {
-    console.error('Error parsing AR glasses message:', error);
-    return null;
+/**
+ * Check that every value in an array is a finite number
+ * @param {number[]} values - Values to check
+ * @returns {boolean} True if no value is NaN or infinite
+ */
+function allFinite(values) {
+  for (let i = 0; i < values.length; i++) {
+    if (!Number.isFinite(values[i])) {
+      return false;
+    }
   }
+  return true;
 }
 
 /**
@@ -179,44 +269,18 @@ function validateSensorData(data) {
 
   // Check required fields
   if (!data.accelerometer || !data.quaternion || !data.timestamps) {
+    warnMalformed('Missing sensor fields in parsed data');
     return false;
   }
 
-  // Check array lengths
-  if (data.accelerometer.length !== 3) {
-    console.warn('Invalid accelerometer data length');
+  // Array lengths are fixed by the parsers (each field is sliced at known
+  // offsets), so only NaN or infinite values need checking
+  if (!allFinite(data.accelerometer) || !allFinite(data.quaternion) ||
+      (data.has_gyro && !(data.gyroscope && allFinite(data.gyroscope)))) {
+    warnMalformed('Invalid sensor value detected');
     return false;
   }
 
-  if (data.quaternion.length !== 4) {
-    console.warn('Invalid quaternion data length');
-    return false;
-  }
-  
-  // Check gyroscope if marked as available
-  if (data.has_gyro && (!data.gyroscope || data.gyroscope.length !== 3)) {
-    console.warn('Invalid gyroscope data length when gyroscope is marked as available');
-    return false;
-  }
-
-  // Check for NaN or infinite values
-  const allValues = [
-    ...data.accelerometer,
-    ...data.quaternion
-  ];
-
-  // Only check gyroscope values if gyroscope is available
-  if (data.has_gyro) {
-    allValues.push(...data.gyroscope);
-  }
-
-  for (const value of allValues) {
-    if (isNaN(value) || !isFinite(value)) {
-      console.warn('Invalid sensor value detected');
-      return false;
-    }
-  }
-
   return true;
 }
 
@@ -226,19 +290,8 @@ function validateSensorData(data) {
  * @returns {number|null} Device index or null if unknown
  */
 function getDeviceIndex(deviceName) {
-  const deviceIndices = {
-    'phone': 0,
-    'iphone': 0,
-    'watch': 1,
-    'applewatch': 1,
-    'headphone': 2,
-    'airpods': 2,
-    'glasses': 2,
-    'arglasses': 2
-  };
-
   const normalized = deviceName.toLowerCase();
-  return deviceIndices[normalized] || null;
+  return DEVICE_INDICES[normalized] || null;
 }
 
 /**
@@ -256,10 +309,10 @@ function createStandardizedData(deviceType, rawData) {
     device_type: deviceType,
     timestamp: Array.isArray(rawData.timestamps) ? rawData.timestamps[0] : rawData.timestamps,
     accelerometer: rawData.accelerometer,
-    gyroscope: rawData.gyroscope || [0, 0, 0],
+    gyroscope: rawData.gyroscope || ZERO_VECTOR3,
     has_gyro: !!rawData.has_gyro,
     quaternion: rawData.quaternion,
-    raw_quaternion: rawData.quaternion.slice(), // Copy
+    raw_quaternion: rawData.quaternion, // Parsed arrays are never mutated, so shared
     timestamps: rawData.timestamps,
     raw_message: rawData.raw_message
   };
@@ -268,7 +321,11 @@ function createStandardizedData(deviceType, rawData) {
 module.exports = {
   parseIOSMessage,
   parseARGlassesMessage,
+  parseNumericFields,
+  createARGlassesSample,
   validateSensorData,
   getDeviceIndex,
-  createStandardizedData
+  createStandardizedData,
+  warnMalformed,
+  WARN_EVERY
 };
\ No newline at end of file
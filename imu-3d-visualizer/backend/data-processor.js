@@ -4,21 +4,49 @@
  * Now includes gravity removal for AR glasses using calibration
  */
 
-const { validateSensorData } = require('./data-parser');
+const { validateSensorData, warnMalformed } = require('./data-parser');
 const fs = require('fs');
 const path = require('path');
 
+const RAD_TO_DEG = 180 / Math.PI;
+
+// Shared fallback for missing/failed 3-vectors (frozen so it can be reused)
+const ZERO_VECTOR3 = Object.freeze([0, 0, 0]);
+
+// World-frame gravity for AR glasses gravity removal, along Z only
+// (negative Z as determined by calibration)
+const GRAVITY_WORLD_Z = -9.81;
+
+// Device name aliases normalized before the index lookup
+const DEVICE_NAME_MAPPING = {
+  'phone': 'phone',
+  'iphone': 'phone',
+  'watch': 'watch',
+  'applewatch': 'watch',
+  'headphone': 'headphone',
+  'airpods': 'headphone',
+  'glasses': 'glasses',
+  'arglasses': 'glasses'
+};
+
 class DataProcessor {
   constructor(useARAsHeadphone = true) {
     this.useARAsHeadphone = useARAsHeadphone;
     
     // Device index mapping for compatibility
-    this.deviceIndices = {
+    // Frozen so it can be handed out without copying
+    this.deviceIndices = Object.freeze({
       'phone': 0,
       'watch': 1,
       'headphone': 2,
       'glasses': 2  // When useARAsHeadphone=true
-    };
+    });
+
+    // Device name aliases resolved straight to their index, so a packet
+    // needs a single lookup
+    this.deviceIndexByName = new Map(
+      Object.entries(DEVICE_NAME_MAPPING).map(([alias, name]) => [alias, this.deviceIndices[name]])
+    );
 
     // Load AR glasses calibration
     this.arGlassesCalibration = null;
@@ -35,6 +63,15 @@ class DataProcessor {
       const calibrationPath = path.join(__dirname, 'rokid_calibration.json');
       if (fs.existsSync(calibrationPath)) {
         const calibrationData = JSON.parse(fs.readFileSync(calibrationPath, 'utf8'));
+        
+        // Validate the bias once here so the per-packet path needs no checks
+        const bias = calibrationData.bias;
+        if (!Array.isArray(bias) || bias.length !== 3 || !bias.every(Number.isFinite)) {
+          console.error(`❌ Invalid AR glasses calibration bias in ${calibrationPath}`);
+          this.arGlassesCalibration = null;
+          return;
+        }
+        
         this.arGlassesCalibration = {
           bias: calibrationData.bias,
           version: calibrationData.version,
@@ -58,8 +95,8 @@ class DataProcessor {
    */
   processDeviceData(deviceType, rawData) {
     try {
+      // The validator has already logged why the packet was rejected
       if (!validateSensorData(rawData)) {
-        console.warn('Invalid sensor data received');
         return null;
       }
 
@@ -68,6 +105,7 @@ class DataProcessor {
       } else if (deviceType === 'ar_glasses') {
         return this.processARGlassesData(rawData);
       } else {
+        // Not a malformed packet: the receiver produced a type with no handler
         console.warn(`Unknown device type: ${deviceType}`);
         return null;
       }
@@ -82,16 +120,18 @@ class DataProcessor {
    */
   processIOSData(rawData) {
     try {
-      const deviceName = rawData.device_name.toLowerCase();
-      const accelerometer = [...rawData.accelerometer]; // Copy array
-      const quaternion = [...rawData.quaternion]; // Copy array
-      const gyroscope = rawData.gyroscope || [0, 0, 0];
+      // The parser already lower-cases the device name
+      const deviceName = rawData.device_name;
+      // Parsed arrays are owned by this packet and never mutated, so no copies
+      const accelerometer = rawData.accelerometer;
+      const quaternion = rawData.quaternion;
+      const gyroscope = rawData.gyroscope || ZERO_VECTOR3;
       const hasGyro = !!rawData.has_gyro;
 
       // Get device index
-      const deviceId = this.getDeviceIndex(deviceName);
-      if (deviceId === null) {
-        console.warn(`Unknown iOS device: ${deviceName}`);
+      const deviceId = this.deviceIndexByName.get(deviceName);
+      if (deviceId === undefined) {
+        warnMalformed('Unknown iOS device: %s', deviceName);
         return null;
       }
 
@@ -109,10 +149,10 @@ class DataProcessor {
         device_type: 'ios',
         timestamp: Array.isArray(rawData.timestamps) ? rawData.timestamps[0] : rawData.timestamps,
         accelerometer: processedAcc,
-        gyroscope: [...gyroscope],
+        gyroscope: gyroscope,
         has_gyro: hasGyro,
         quaternion: processedQuat,
-        raw_quaternion: [...quaternion],
+        raw_quaternion: quaternion,
         euler: eulerAngles,
         raw_message: rawData.raw_message
       };
@@ -127,9 +167,9 @@ class DataProcessor {
    */
   processARGlassesData(rawData) {
     try {
-      const accelerometer = [...rawData.accelerometer];
-      const quaternion = [...rawData.quaternion];
-      const gyroscope = rawData.gyroscope || [0, 0, 0];
+      const accelerometer = rawData.accelerometer;
+      const quaternion = rawData.quaternion;
+      const gyroscope = rawData.gyroscope || ZERO_VECTOR3;
       const hasGyro = !!rawData.has_gyro;
 
       // Determine device index based on useARAsHeadphone flag
@@ -157,10 +197,10 @@ class DataProcessor {
         timestamp: Array.isArray(rawData.timestamps) ? rawData.timestamps[0] : rawData.timestamps,
         accelerometer: rawAcc, // Raw acceleration (gravity included)
         linear_acceleration: linearAcc, // Gravity-removed and bias-corrected acceleration
-        gyroscope: [...gyroscope],
+        gyroscope: gyroscope,
         has_gyro: hasGyro,
         quaternion: processedQuat,
-        raw_quaternion: [...quaternion],
+        raw_quaternion: quaternion,
         euler: eulerAngles,
         calibration_applied: !!this.arGlassesCalibration,
         raw_message: rawData.raw_message
@@ -175,31 +215,17 @@ class DataProcessor {
    * Get device index for compatibility
    */
   getDeviceIndex(deviceName) {
-    const nameMapping = {
-      'phone': 'phone',
-      'iphone': 'phone',
-      'watch': 'watch',
-      'applewatch': 'watch',
-      'headphone': 'headphone',
-      'airpods': 'headphone',
-      'glasses': 'glasses',
-      'arglasses': 'glasses'
-    };
-
-    const normalizedName = nameMapping[deviceName.toLowerCase()];
-    if (normalizedName) {
-      return this.deviceIndices[normalizedName];
-    }
-    return null;
+    const deviceId = this.deviceIndexByName.get(deviceName.toLowerCase());
+    return deviceId === undefined ? null : deviceId;
   }
 
   /**
    * Apply device-specific coordinate transformations for iOS devices
    */
   applyIOSTransformations(deviceName, accelerometer, quaternion) {
-    // Copy arrays to avoid modifying originals
-    let acc = [...accelerometer];
-    let quat = [...quaternion];
+    // Transformations build new arrays, so the inputs are never modified
+    let acc = accelerometer;
+    let quat = quaternion;
 
     // Apply device-specific transformations
     if (deviceName === 'headphone') {
@@ -217,45 +243,24 @@ class DataProcessor {
    * Apply coordinate transformations for AR glasses with proper gravity removal
    */
   applyARGlassesTransformations(accelerometer, quaternion) {
-    // Copy arrays
-    const acc = [...accelerometer];
-    const quat = [...quaternion];
+    const acc = accelerometer;
+    const quat = quaternion;
 
     // Keep raw acceleration as is (it's already in the coordinate system from Unity)
-    const rawAcc = [...acc];
+    const rawAcc = acc;
 
     // Calculate gravity-removed linear acceleration
-    let linearAcc;
-    try {
-      // Remove gravity using the same method as Python
-      const gravityWorld = [0, 0, -9.81]; // Negative Z as determined by calibration
-      
-      // Transform gravity to device frame
-      const rotationMatrix = this.quaternionToRotationMatrix(quat);
-      const rotationMatrixInv = this.transposeMatrix(rotationMatrix);
-      const gravityDevice = this.multiplyMatrixVector(rotationMatrixInv, gravityWorld);
-      
-      // Remove gravity from acceleration
-      linearAcc = [
-        acc[0] - gravityDevice[0],
-        acc[1] - gravityDevice[1],
-        acc[2] - gravityDevice[2]
-      ];
-      
-      // Apply bias correction if calibration is loaded
-      if (this.arGlassesCalibration && this.arGlassesCalibration.bias) {
-        linearAcc = [
-          linearAcc[0] - this.arGlassesCalibration.bias[0],
-          linearAcc[1] - this.arGlassesCalibration.bias[1],
-          linearAcc[2] - this.arGlassesCalibration.bias[2]
-        ];
-      }
-      
-    } catch (error) {
-      console.warn('Failed to calculate linear acceleration:', error);
-      // If gravity removal fails, return zeros
-      linearAcc = [0, 0, 0];
-    }
+    // Transform gravity to device frame: R^T * [0, 0, g] only needs the
+    // third row of the rotation matrix, so build just that row
+    const gravityDevice = this.rotateWorldZToDevice(quat, GRAVITY_WORLD_Z);
+    
+    // Remove gravity (and the calibrated bias, if loaded) from acceleration
+    const bias = this.arGlassesCalibration ? this.arGlassesCalibration.bias : ZERO_VECTOR3;
+    const linearAcc = [
+      acc[0] - gravityDevice[0] - bias[0],
+      acc[1] - gravityDevice[1] - bias[1],
+      acc[2] - gravityDevice[2] - bias[2]
+    ];
 
     return { 
       rawAcc: rawAcc,
@@ -268,38 +273,8 @@ class DataProcessor {
    * Convert quaternion to Euler angles (roll, pitch, yaw) in degrees
    */
   quaternionToEuler(quaternion) {
-    try {
-      const [x, y, z, w] = quaternion;
-      
-      // Roll (x-axis rotation)
-      const sinr_cosp = 2 * (w * x + y * z);
-      const cosr_cosp = 1 - 2 * (x * x + y * y);
-      const roll = Math.atan2(sinr_cosp, cosr_cosp);
-
-      // Pitch (y-axis rotation)
-      const sinp = 2 * (w * y - z * x);
-      let pitch;
-      if (Math.abs(sinp) >= 1) {
-        pitch = Math.sign(sinp) * Math.PI / 2;
-      } else {
-        pitch = Math.asin(sinp);
-      }
-
-      // Yaw (z-axis rotation)
-      const siny_cosp = 2 * (w * z + x * y);
-      const cosy_cosp = 1 - 2 * (y * y + z * z);
-      const yaw = Math.atan2(siny_cosp, cosy_cosp);
-
-      // Convert to degrees
-      return [
-        roll * 180 / Math.PI,
-        pitch * 180 / Math.PI,
-        yaw * 180 / Math.PI
-      ];
-    } catch (error) {
-      console.warn('Failed to convert quaternion to Euler:', error);
-      return [0, 0, 0];
-    }
+    const [roll, pitch, yaw] = this.quaternionToEulerRadians(quaternion);
+    return [roll * RAD_TO_DEG, pitch * RAD_TO_DEG, yaw * RAD_TO_DEG];
   }
 
   /**
@@ -352,47 +327,17 @@ class DataProcessor {
   }
 
   /**
-   * Convert quaternion to rotation matrix
+   * Rotate a world-frame vector [0, 0, z] into the device frame
+   * Equivalent to R^T * [0, 0, z] for the rotation matrix R of q, so only
+   * the third row of R is needed
    */
-  quaternionToRotationMatrix(quaternion) {
+  rotateWorldZToDevice(quaternion, worldZ) {
     const [x, y, z, w] = quaternion;
-    
-    const xx = x * x;
-    const yy = y * y;
-    const zz = z * z;
-    const xy = x * y;
-    const xz = x * z;
-    const yz = y * z;
-    const wx = w * x;
-    const wy = w * y;
-    const wz = w * z;
-
-    return [
-      [1 - 2 * (yy + zz), 2 * (xy - wz), 2 * (xz + wy)],
-      [2 * (xy + wz), 1 - 2 * (xx + zz), 2 * (yz - wx)],
-      [2 * (xz - wy), 2 * (yz + wx), 1 - 2 * (xx + yy)]
-    ];
-  }
 
-  /**
-   * Transpose a 3x3 matrix
-   */
-  transposeMatrix(matrix) {
-    return [
-      [matrix[0][0], matrix[1][0], matrix[2][0]],
-      [matrix[0][1], matrix[1][1], matrix[2][1]],
-      [matrix[0][2], matrix[1][2], matrix[2][2]]
-    ];
-  }
-
-  /**
-   * Multiply a 3x3 matrix with a 3D vector
-   */
-  multiplyMatrixVector(matrix, vector) {
     return [
-      matrix[0][0] * vector[0] + matrix[0][1] * vector[1] + matrix[0][2] * vector[2],
-      matrix[1][0] * vector[0] + matrix[1][1] * vector[1] + matrix[1][2] * vector[2],
-      matrix[2][0] * vector[0] + matrix[2][1] * vector[1] + matrix[2][2] * vector[2]
+      2 * (x * z - w * y) * worldZ,
+      2 * (y * z + w * x) * worldZ,
+      (1 - 2 * (x * x + y * y)) * worldZ
     ];
   }
 
@@ -410,7 +355,7 @@ class DataProcessor {
   getStatistics() {
     return {
       useARAsHeadphone: this.useARAsHeadphone,
-      deviceIndices: { ...this.deviceIndices },
+      deviceIndices: this.deviceIndices,
       arGlassesCalibrationLoaded: !!this.arGlassesCalibration,
       arGlassesBias: this.arGlassesCalibration ? this.arGlassesCalibration.bias : null
     };
@@ -4,16 +4,46 @@ const UDPReceiver = require('./udp-receiver');
 const DataProcessor = require('./data-processor');
 const CalibrationManager = require('./calibration-manager');
 
+// Initial capacity of the per-device tracking tables (grown on demand)
+const INITIAL_DEVICE_SLOTS = 16;
+
+/**
+ * Read UDP_RECV_BUFFER_SIZE from the environment
+ * @returns {number|undefined} Size in bytes, or undefined to keep the receiver default
+ */
+function readRecvBufferSize() {
+  const raw = process.env.UDP_RECV_BUFFER_SIZE;
+  if (raw === undefined || raw === '') {
+    return undefined;
+  }
+
+  const size = Number(raw);
+  if (!Number.isSafeInteger(size) || size <= 0) {
+    console.warn(`⚠️  Ignoring invalid UDP_RECV_BUFFER_SIZE "${raw}", using the default`);
+    return undefined;
+  }
+  return size;
+}
+
 class IMUWebSocketServer {
   constructor() {
     this.port = 3001;
     this.udpPort = 8001;
+    // Kernel receive buffer for the UDP socket; override with
+    // UDP_RECV_BUFFER_SIZE=<bytes> (undefined keeps the receiver default)
+    this.udpRecvBufferSize = readRecvBufferSize();
     this.clients = new Map(); // Changed to Map for better client tracking
+    this.flushScheduled = false;
     this.dataProcessor = new DataProcessor();
     this.calibrationManager = new CalibrationManager();
     
     // Add device tracking for gyro capabilities
-    this.deviceCapabilities = {};
+    // Static device info lives in deviceInfo; the per-packet fields are kept in
+    // typed arrays indexed by slot so updates don't allocate per packet
+    this.deviceSlots = new Map(); // deviceIdentifier -> slot index
+    this.deviceInfo = [];
+    this.deviceLastSeen = new Float64Array(INITIAL_DEVICE_SLOTS);
+    this.deviceHasGyro = new Uint8Array(INITIAL_DEVICE_SLOTS);
     
     // Statistics
     this.stats = {
@@ -43,7 +73,8 @@ class IMUWebSocketServer {
       this.clients.set(clientId, {
         ws: ws,
         ip: clientIP,
-        connectedAt: Date.now()
+        connectedAt: Date.now(),
+        pendingMessages: [] // Serialized IMU messages waiting for the next flush
       });
       this.stats.clients = this.clients.size;
 
@@ -81,7 +112,7 @@ class IMUWebSocketServer {
     });
 
     // Initialize UDP Receiver
-    this.udpReceiver = new UDPReceiver(this.udpPort);
+    this.udpReceiver = new UDPReceiver(this.udpPort, '0.0.0.0', this.udpRecvBufferSize);
     this.udpReceiver.on('data', (deviceType, rawData, clientIP) => {
       this.handleIMUData(deviceType, rawData, clientIP);
     });
@@ -158,26 +189,37 @@ class IMUWebSocketServer {
         
         // Track device capabilities for better reporting
         const deviceIdentifier = `${processedData.device_name}-${clientIP}`;
+        let slot = this.deviceSlots.get(deviceIdentifier);
         
-        // Update device capabilities tracking
-        if (!this.deviceCapabilities[deviceIdentifier]) {
-          this.deviceCapabilities[deviceIdentifier] = {
+        if (slot === undefined) {
+          slot = this.allocateDeviceSlot(deviceIdentifier, {
             device_name: processedData.device_name,
             device_type: deviceType,
-            has_gyro: processedData.has_gyro,
-            client_ip: clientIP,
-            last_seen: new Date()
-          };
+            client_ip: clientIP
+          });
           
           // Log when we detect a new device
           console.log(`📱 New device detected: ${processedData.device_name} from ${clientIP} (has_gyro: ${processedData.has_gyro ? 'YES' : 'NO'})`);
-        } else {
-          // Update last seen time
-          this.deviceCapabilities[deviceIdentifier].last_seen = new Date();
         }
         
+        // Read the clock once per packet; it is shared by the last-seen
+        // time and every client's message timestamp
+        const now = Date.now();
+        
+        // Update last seen time and gyro capability
+        this.deviceLastSeen[slot] = now;
+        this.deviceHasGyro[slot] = processedData.has_gyro ? 1 : 0;
+        
+        // Uncalibrated clients all receive the same message, so it is
+        // serialized at most once per packet
+        let uncalibratedMessage = null;
+        
         // Apply calibration for each connected client
         this.clients.forEach((client, clientId) => {
+          if (client.ws.readyState !== WebSocket.OPEN) {
+            return;
+          }
+          
           // Check if this client has calibration
           let dataToSend = processedData;
           
@@ -186,29 +228,26 @@ class IMUWebSocketServer {
             dataToSend = this.calibrationManager.applyCalibration(clientId, processedData);
           }
           
-          // Send to this specific client
-          if (client.ws.readyState === WebSocket.OPEN) {
-            const message = JSON.stringify({
+          const isShared = dataToSend === processedData;
+          let message = isShared ? uncalibratedMessage : null;
+          
+          if (!message) {
+            message = JSON.stringify({
               type: 'imu_data',
               deviceType,
               data: dataToSend,
-              timestamp: Date.now(),
+              timestamp: now,
               clientIP
             });
             
-            try {
-              client.ws.send(message);
-            } catch (error) {
-              console.error(`Error sending to client ${clientId}:`, error);
+            if (isShared) {
+              uncalibratedMessage = message;
             }
           }
+          
+          // Queue for this specific client
+          this.queueClientMessage(client, message);
         });
-
-        // Log occasionally
-        const totalCount = this.stats[deviceType];
-        if (totalCount % 100 === 0) {
-          console.log(`📊 ${deviceType}: ${totalCount} packets from ${clientIP}`);
-        }
       } else {
         this.stats.errors++;
       }
@@ -218,6 +257,75 @@ class IMUWebSocketServer {
     }
   }
 
+  /**
+   * Queue a serialized message for a client
+   * All packets read in one event loop iteration are flushed together on
+   * setImmediate, so a burst costs one WebSocket frame per client
+   * @param {Object} client - Client record
+   * @param {string} message - Serialized message
+   */
+  queueClientMessage(client, message) {
+    client.pendingMessages.push(message);
+    
+    if (!this.flushScheduled) {
+      this.flushScheduled = true;
+      setImmediate(() => this.flushClientMessages());
+    }
+  }
+
+  /**
+   * Send each client its queued messages, batching when there is more than one
+   */
+  flushClientMessages() {
+    this.flushScheduled = false;
+    
+    this.clients.forEach((client, clientId) => {
+      const pending = client.pendingMessages;
+      if (pending.length === 0) {
+        return;
+      }
+      client.pendingMessages = [];
+      
+      if (client.ws.readyState !== WebSocket.OPEN) {
+        return;
+      }
+      
+      // Messages are already serialized, so the batch is assembled by concatenation
+      const payload = pending.length === 1
+        ? pending[0]
+        : `{"type":"imu_batch","messages":[${pending.join(',')}]}`;
+      
+      try {
+        client.ws.send(payload);
+      } catch (error) {
+        console.error(`Error sending to client ${clientId}:`, error);
+      }
+    });
+  }
+
+  /**
+   * Assign a tracking slot to a newly seen device, growing the tables if full
+   * @param {string} deviceIdentifier - Device name and client IP
+   * @param {Object} info - Static device info (name, type, client IP)
+   * @returns {number} Slot index
+   */
+  allocateDeviceSlot(deviceIdentifier, info) {
+    const slot = this.deviceInfo.length;
+    
+    if (slot === this.deviceLastSeen.length) {
+      const lastSeen = new Float64Array(slot * 2);
+      const hasGyro = new Uint8Array(slot * 2);
+      lastSeen.set(this.deviceLastSeen);
+      hasGyro.set(this.deviceHasGyro);
+      this.deviceLastSeen = lastSeen;
+      this.deviceHasGyro = hasGyro;
+    }
+    
+    this.deviceInfo.push(info);
+    this.deviceSlots.set(deviceIdentifier, slot);
+    return slot;
+  }
+
   startStatsLogger() {
     setInterval(() => {
       const total = this.stats.ios + this.stats.ar_glasses + this.stats.unknown + this.stats.errors;
@@ -229,6 +337,7 @@ class IMUWebSocketServer {
         console.log(`❓ Unknown: ${this.stats.unknown} packets`);
         console.log(`❌ Errors: ${this.stats.errors} packets`);
         console.log(`🌐 Connected clients: ${this.stats.clients}`);
+        console.log(`📡 UDP packets received: ${this.udpReceiver.getStatistics().packetCount}`);
         
         // Log calibration status
         let calibratedClients = 0;
@@ -240,11 +349,11 @@ class IMUWebSocketServer {
         console.log(`📐 Calibrated clients: ${calibratedClients}`);
         
         // Log device capabilities
-        if (Object.keys(this.deviceCapabilities).length > 0) {
+        if (this.deviceInfo.length > 0) {
           console.log('\n📱 Device Capabilities:');
-          Object.values(this.deviceCapabilities).forEach(device => {
-            const lastSeenTime = new Date(device.last_seen).toLocaleTimeString();
-            console.log(`  - ${device.device_name} (${device.client_ip}): Gyroscope: ${device.has_gyro ? 'YES' : 'NO'} (Last seen: ${lastSeenTime})`);
+          this.deviceInfo.forEach((device, slot) => {
+            const lastSeenTime = new Date(this.deviceLastSeen[slot]).toLocaleTimeString();
+            console.log(`  - ${device.device_name} (${device.client_ip}): Gyroscope: ${this.deviceHasGyro[slot] ? 'YES' : 'NO'} (Last seen: ${lastSeenTime})`);
           });
         }
         
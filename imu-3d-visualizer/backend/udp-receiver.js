@@ -1,17 +1,39 @@
 const dgram = require('dgram');
 const EventEmitter = require('events');
-const { parseIOSMessage, parseARGlassesMessage } = require('./data-parser');
+const { parseIOSMessage, parseNumericFields, createARGlassesSample, WARN_EVERY } = require('./data-parser');
+
+// Requested kernel receive buffer (SO_RCVBUF). The default (~208 KB on Linux)
+// can overflow while the event loop is busy, silently dropping packets.
+// The kernel caps the request at net.core.rmem_max; raise it with e.g.
+//   sysctl -w net.core.rmem_max=12582912
+const DEFAULT_RECV_BUFFER_SIZE = 4 * 1024 * 1024;
+
+// Unknown-format messages are throttled like the parser's malformed-packet warnings
+const UNKNOWN_LOG_EVERY = WARN_EVERY;
+
+// Shared result for messages that could not be classified
+const UNCLASSIFIED = Object.freeze({ deviceType: null, parsedData: null });
+
+// Unity-style indicator, matched case-insensitively without lower-casing a copy
+const UNITY_PATTERN = /unity/i;
+
+// ASCII whitespace (space, \t, \n, \v, \f, \r)
+function isWhitespaceByte(byte) {
+  return byte === 32 || (byte >= 9 && byte <= 13);
+}
 
 class UDPReceiver extends EventEmitter {
-  constructor(port = 8001, host = '0.0.0.0') {
+  constructor(port = 8001, host = '0.0.0.0', recvBufferSize = DEFAULT_RECV_BUFFER_SIZE) {
     super();
     this.port = port;
     this.host = host;
+    this.recvBufferSize = recvBufferSize;
     this.socket = null;
     this.isRunning = false;
     
     // Statistics
     this.packetCount = 0;
+    this.unknownCount = 0;
     this.lastStatsTime = Date.now();
     
     console.log(`📡 UDP Receiver configured for ${host}:${port}`);
@@ -20,7 +42,10 @@ class UDPReceiver extends EventEmitter {
   start() {
     try {
       // Create UDP socket
-      this.socket = dgram.createSocket('udp4');
+      this.socket = dgram.createSocket({
+        type: 'udp4',
+        recvBufferSize: this.recvBufferSize
+      });
       
       // Handle incoming messages
       this.socket.on('message', (buffer, rinfo) => {
@@ -31,6 +56,7 @@ class UDPReceiver extends EventEmitter {
       this.socket.on('listening', () => {
         const address = this.socket.address();
         console.log(`📡 UDP receiver listening on ${address.address}:${address.port}`);
+        this.logRecvBufferSize();
         this.isRunning = true;
       });
 
@@ -67,8 +93,13 @@ class UDPReceiver extends EventEmitter {
     try {
       this.packetCount++;
       
-      // Convert buffer to string
-      const messageStr = buffer.toString('utf8').trim();
+      // Convert buffer to string, decoding only the range without surrounding
+      // whitespace so no second trimmed copy of the message is made
+      let start = 0;
+      let end = buffer.length;
+      while (start < end && isWhitespaceByte(buffer[start])) start++;
+      while (end > start && isWhitespaceByte(buffer[end - 1])) end--;
+      const messageStr = buffer.toString('utf8', start, end);
       const clientIP = rinfo.address;
       
       // Skip empty messages
@@ -80,13 +111,9 @@ class UDPReceiver extends EventEmitter {
       const { deviceType, parsedData } = this.classifyAndParseMessage(messageStr, clientIP);
       
       if (deviceType && parsedData) {
-        // Emit parsed data
+        // Emit parsed data (packet counts are logged by the server's
+        // periodic statistics instead of per packet)
         this.emit('data', deviceType, parsedData, clientIP);
-        
-        // Debug log occasionally
-        if (this.packetCount % 500 === 0) {
-          console.log(`📊 Processed ${this.packetCount} UDP packets`);
-        }
       } else {
         // Log unknown format for debugging
         this.emit('data', 'unknown', { 
@@ -108,48 +135,78 @@ class UDPReceiver extends EventEmitter {
     try {
       // Method 1: Try iOS format first (has semicolon and colon)
       // Format: "device_id;device_type:timestamp1 timestamp2 ax ay az qx qy qz qw [gx gy gz]"
-      if (messageStr.includes(';') && messageStr.includes(':')) {
-        const parsedData = parseIOSMessage(messageStr);
-        if (parsedData) {
-          return { deviceType: 'ios', parsedData };
-        }
+      // The parser locates the separators itself and returns null without them
+      const iosData = parseIOSMessage(messageStr);
+      if (iosData) {
+        return { deviceType: 'ios', parsedData: iosData };
       }
 
       // Method 2: Try AR glasses format (space-separated numeric values)
       // Format: "timestamp device_timestamp qx qy qz qw ax ay az [gx gy gz]"
-      const parts = messageStr.split(/\s+/);
-      if (parts.length >= 9) {
-        // Check if all required parts are numeric
-        const numericParts = parts.slice(0, 9);
-        const allNumeric = numericParts.every(part => {
-          const num = parseFloat(part);
-          return !isNaN(num) && isFinite(num);
-        });
-
-        if (allNumeric) {
-          const parsedData = parseARGlassesMessage(messageStr);
-          if (parsedData) {
-            return { deviceType: 'ar_glasses', parsedData };
-          }
-        }
-      }
-
       // Method 3: Check for Unity-style indicators
-      if (messageStr.toLowerCase().includes('unity') || 
-          (parts.length >= 9 && parts.every(p => !isNaN(parseFloat(p))))) {
-        const parsedData = parseARGlassesMessage(messageStr);
+      // The fields are parsed once and reused to build the sample
+      const values = parseNumericFields(messageStr);
+      if (this.isARGlassesMessage(values, messageStr)) {
+        const parsedData = createARGlassesSample(values, messageStr);
         if (parsedData) {
           return { deviceType: 'ar_glasses', parsedData };
         }
       }
 
-      // Unknown format
-      console.log(`❓ Unknown message format from ${clientIP}: "${messageStr.substring(0, 50)}..."`);
-      return { deviceType: null, parsedData: null };
+      // Unknown format (throttled, and only formatted when actually logged)
+      if (this.unknownCount % UNKNOWN_LOG_EVERY === 0) {
+        console.log(`❓ Unknown message format from ${clientIP}: "${messageStr.substring(0, 50)}..." (${this.unknownCount + 1} so far)`);
+      }
+      this.unknownCount++;
+      return UNCLASSIFIED;
 
     } catch (error) {
       console.error(`Error classifying message from ${clientIP}:`, error);
-      return { deviceType: null, parsedData: null };
+      return UNCLASSIFIED;
+    }
+  }
+
+  /**
+   * Decide whether a message should be parsed as AR glasses data
+   * @param {number[]} values - Whitespace-separated fields, parsed
+   * @param {string} messageStr - Message text
+   * @returns {boolean} True if the first 9 fields are finite numbers, if
+   *   every field is numeric, or if the message mentions Unity
+   */
+  isARGlassesMessage(values, messageStr) {
+    if (values.length >= 9) {
+      let leadingFinite = true;
+      for (let i = 0; i < 9; i++) {
+        if (!isFinite(values[i])) {
+          leadingFinite = false;
+          break;
+        }
+      }
+      
+      if (leadingFinite || values.every(value => !isNaN(value))) {
+        return true;
+      }
+    }
+    
+    return UNITY_PATTERN.test(messageStr);
+  }
+
+  /**
+   * Log the effective kernel receive buffer size
+   * Linux reports double the granted size (bookkeeping overhead included)
+   * and silently caps requests at net.core.rmem_max
+   */
+  logRecvBufferSize() {
+    try {
+      const effective = this.socket.getRecvBufferSize();
+      const granted = process.platform === 'linux' ? effective / 2 : effective;
+      console.log(`📡 UDP receive buffer: requested ${this.recvBufferSize} bytes, effective ${effective} bytes`);
+      
+      if (granted < this.recvBufferSize) {
+        console.warn('⚠️ UDP receive buffer is smaller than requested; raise net.core.rmem_max to avoid drops under load');
+      }
+    } catch (error) {
+      console.error('Failed to read UDP receive buffer size:', error);
     }
   }
 
@@ -158,7 +215,8 @@ class UDPReceiver extends EventEmitter {
       packetCount: this.packetCount,
       isRunning: this.isRunning,
       port: this.port,
-      host: this.host
+      host: this.host,
+      recvBufferSize: this.recvBufferSize
     };
   }
 }
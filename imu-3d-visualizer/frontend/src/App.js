@@ -1,19 +1,47 @@
 // App.js - Updated to use server-side calibration
-import React, { useState, useEffect, useRef } from 'react';
+import React, { useState, useEffect, useRef, useMemo } from 'react';
 import ThreeJSScene from './components/ThreeJSScene';
 import IMUOverlay from './components/IMUOverlay';
 import ConnectionStatus from './components/ConnectionStatus';
 import CalibrationPanel from './components/CalibrationPanel';
 import { quaternionToEuler } from './utils/mathUtils';
+import { HistoryBuffer } from './utils/historyBuffer';
 import './App.css';
 
 const WEBSOCKET_URL = 'ws://localhost:3001';
+const MAX_IMU_MESSAGES_PER_FRAME = 256;
+const MAX_PENDING_IMU_MESSAGES = 4 * MAX_IMU_MESSAGES_PER_FRAME; // Oldest are dropped beyond this
+const HIDDEN_FLUSH_INTERVAL_MS = 250; // Flush timer used while the tab is hidden
+const MAX_HISTORY = 512; // ~17 seconds at 30Hz (power of two for the ring buffers)
+const FREQUENCY_EMA_ALPHA = 0.05; // Smoothing factor for the sample interval average
+
+// Per-device sample history, one ring buffer per tracked signal
+const createDeviceHistory = () => ({
+  accelerometerHistory: new HistoryBuffer(MAX_HISTORY),
+  linearAccelerationHistory: new HistoryBuffer(MAX_HISTORY),
+  gyroscopeHistory: new HistoryBuffer(MAX_HISTORY),
+  eulerHistory: new HistoryBuffer(MAX_HISTORY),
+  quaternionHistory: new HistoryBuffer(MAX_HISTORY, 4),
+  worldFrameAccelerometerHistory: new HistoryBuffer(MAX_HISTORY),
+  worldFrameLinearAccelerationHistory: new HistoryBuffer(MAX_HISTORY),
+  worldFrameQuaternionHistory: new HistoryBuffer(MAX_HISTORY, 4),
+  worldFrameEulerHistory: new HistoryBuffer(MAX_HISTORY)
+});
 
 function App() {
   // WebSocket connection
   const [connectionStatus, setConnectionStatus] = useState('disconnected');
   const wsRef = useRef(null);
 
+  // Incoming IMU messages are buffered and applied once per animation frame,
+  // so a burst of packets causes a single state update instead of one per message
+  const pendingIMURef = useRef([]);
+  const flushFrameRef = useRef(null);
+  const flushTimerRef = useRef(null);
+
+  // History ring buffers live outside React state and are filled in place
+  const historyRef = useRef({});
+
   // Device data state
   const [devices, setDevices] = useState({});
   const [stats, setStats] = useState({
@@ -89,12 +117,26 @@ function App() {
       if (reconnectTimer) {
         clearTimeout(reconnectTimer);
       }
+      cancelIMUFlush();
       if (wsRef.current) {
         wsRef.current.close();
       }
     };
   }, []);
 
+  // requestAnimationFrame is paused in hidden tabs, so move a pending flush
+  // onto the timer (and back) whenever visibility changes
+  useEffect(() => {
+    const handleVisibilityChange = () => {
+      if (cancelIMUFlush()) {
+        scheduleIMUFlush();
+      }
+    };
+
+    document.addEventListener('visibilitychange', handleVisibilityChange);
+    return () => document.removeEventListener('visibilitychange', handleVisibilityChange);
+  }, []);
+
   // Handle device selection
   useEffect(() => {
     if (selectedDevice) {
@@ -117,6 +159,11 @@ function App() {
         handleIMUData(message);
         break;
 
+      case 'imu_batch':
+        // Several imu_data messages the server coalesced into one frame
+        message.messages.forEach(handleIMUData);
+        break;
+
       case 'calibration_confirmed':
         console.log('✅ Calibration confirmed by server');
         break;
@@ -127,159 +174,202 @@ function App() {
   };
 
   const handleIMUData = (message) => {
-    const { deviceType, data, clientIP } = message;
+    const { data } = message;
     
     if (!data || data.device_id === null || data.device_id === undefined) {
       return;
     }
 
-    const deviceKey = `${data.device_name}_${data.device_id}`;
-    const timestamp = Date.now();
+    const pending = pendingIMURef.current;
+    pending.push({
+      message,
+      timestamp: performance.now() // Monotonic, unaffected by clock changes
+    });
 
-    setDevices(prevDevices => {
-      const currentDevice = prevDevices[deviceKey] || {
-        device_id: data.device_id,
-        device_name: data.device_name,
-        device_type: data.device_type || deviceType,
-        clientIP: clientIP,
-        isActive: true,
-        lastUpdate: timestamp,
-        sampleCount: 0,
-        frequency: 0,
-        accelerometerHistory: [],
-        linearAccelerationHistory: [],
-        gyroscopeHistory: [],
-        eulerHistory: [],
-        quaternionHistory: [],
-        worldFrameAccelerometerHistory: [],
-        worldFrameLinearAccelerationHistory: [],
-        worldFrameQuaternionHistory: [],
-        worldFrameEulerHistory: []
-      };
-
-      // Update device data with all data from server (including world frame if present)
-      const updatedDevice = {
-        ...currentDevice,
-        // Raw data
-        accelerometer: data.accelerometer,
-        quaternion: data.quaternion,
-        euler: data.euler || quaternionToEuler(data.quaternion),
-        has_gyro: !!data.has_gyro,
-        
-        // World frame data (if server calculated it)
-        worldFrameQuaternion: data.worldFrameQuaternion,
-        worldFrameQuatForViz: data.worldFrameQuatForViz,
-        worldFrameAccelerometer: data.worldFrameAccelerometer,
-        worldFrameEuler: data.worldFrameEuler,
-        worldFrameLinearAcceleration: data.worldFrameLinearAcceleration,
-        isCalibrated: !!data.isCalibrated,
-        
-        // Metadata
-        lastUpdate: timestamp,
-        sampleCount: currentDevice.sampleCount + 1,
-        isActive: true,
-        clientIP: clientIP
-      };
-      
-      // Handle gyroscope data if available
-      if (data.has_gyro) {
-        updatedDevice.gyroscope = data.gyroscope || [0, 0, 0];
-      }
-      
-      // Handle linear acceleration data for AR glasses
-      if (data.linear_acceleration) {
-        updatedDevice.linear_acceleration = data.linear_acceleration;
-      }
+    // Bound the queue if flushing falls behind; stale samples are dropped first
+    if (pending.length > MAX_PENDING_IMU_MESSAGES) {
+      pending.splice(0, pending.length - MAX_PENDING_IMU_MESSAGES);
+    }
 
-      // Add to history buffers (keep last 300 samples ~10 seconds at 30Hz)
-      const maxHistory = 300;
-      const addToHistory = (history, newData) => {
-        if (!newData) return history || [];
-        const updated = [...(history || []), { timestamp, data: newData }];
-        return updated.slice(-maxHistory);
-      };
-
-      // Always track raw data
-      updatedDevice.accelerometerHistory = addToHistory(
-        currentDevice.accelerometerHistory, 
-        data.accelerometer
-      );
-      
-      updatedDevice.eulerHistory = addToHistory(
-        currentDevice.eulerHistory, 
-        data.euler || updatedDevice.euler
-      );
-      
-      updatedDevice.quaternionHistory = addToHistory(
-        currentDevice.quaternionHistory, 
-        data.quaternion
-      );
-      
-      // Track linear acceleration for AR glasses
-      if (data.linear_acceleration) {
-        updatedDevice.linearAccelerationHistory = addToHistory(
-          currentDevice.linearAccelerationHistory || [],
-          data.linear_acceleration
-        );
-      }
-      
-      // Only add gyroscope data to history if the device has a gyroscope
-      if (data.has_gyro) {
-        updatedDevice.gyroscopeHistory = addToHistory(
-          currentDevice.gyroscopeHistory, 
-          data.gyroscope
-        );
-      }
-      
-      // Track world frame data if available from server
-      if (data.worldFrameAccelerometer) {
-        updatedDevice.worldFrameAccelerometerHistory = addToHistory(
-          currentDevice.worldFrameAccelerometerHistory || [],
-          data.worldFrameAccelerometer
-        );
-      }
-      
-      if (data.worldFrameQuaternion) {
-        updatedDevice.worldFrameQuaternionHistory = addToHistory(
-          currentDevice.worldFrameQuaternionHistory || [],
-          data.worldFrameQuaternion
-        );
-      }
-      
-      if (data.worldFrameEuler) {
-        updatedDevice.worldFrameEulerHistory = addToHistory(
-          currentDevice.worldFrameEulerHistory || [],
-          data.worldFrameEuler
-        );
-      }
-      
-      // Track world frame linear acceleration if available
-      if (data.worldFrameLinearAcceleration) {
-        updatedDevice.worldFrameLinearAccelerationHistory = addToHistory(
-          currentDevice.worldFrameLinearAccelerationHistory || [],
-          data.worldFrameLinearAcceleration
-        );
-      }
+    if (flushFrameRef.current === null && flushTimerRef.current === null) {
+      scheduleIMUFlush();
+    }
+  };
 
-      // Calculate frequency (approximate)
-      if (updatedDevice.sampleCount % 30 === 0) {
-        const timeSpan = timestamp - (updatedDevice.accelerometerHistory[0]?.timestamp || timestamp);
-        if (timeSpan > 0) {
-          updatedDevice.frequency = Math.round((updatedDevice.accelerometerHistory.length / timeSpan) * 1000);
-        }
+  // Flush on the next animation frame, or on a timer while the tab is hidden
+  // (browsers pause requestAnimationFrame there, but messages keep arriving)
+  const scheduleIMUFlush = () => {
+    if (document.hidden) {
+      flushTimerRef.current = setTimeout(flushIMUData, HIDDEN_FLUSH_INTERVAL_MS);
+    } else {
+      flushFrameRef.current = requestAnimationFrame(flushIMUData);
+    }
+  };
+
+  // Cancel a scheduled flush; returns true if one was pending
+  const cancelIMUFlush = () => {
+    const wasScheduled = flushFrameRef.current !== null || flushTimerRef.current !== null;
+    if (flushFrameRef.current !== null) {
+      cancelAnimationFrame(flushFrameRef.current);
+      flushFrameRef.current = null;
+    }
+    if (flushTimerRef.current !== null) {
+      clearTimeout(flushTimerRef.current);
+      flushTimerRef.current = null;
+    }
+    return wasScheduled;
+  };
+
+  const flushIMUData = () => {
+    flushFrameRef.current = null;
+    flushTimerRef.current = null;
+
+    // Cap the work per frame to bound render jitter; leftovers go to the next
+    // frame. Nothing is painted while hidden, so the whole queue is drained then
+    const pending = pendingIMURef.current;
+    const limit = document.hidden ? pending.length : MAX_IMU_MESSAGES_PER_FRAME;
+    const batch = pending.splice(0, Math.min(limit, pending.length));
+
+    if (pending.length > 0) {
+      scheduleIMUFlush();
+    }
+
+    // Record history before the state update so the updater stays pure
+    batch.forEach(entry => {
+      const { data } = entry.message;
+      entry.deviceKey = `${data.device_name}_${data.device_id}`;
+      entry.euler = data.euler || quaternionToEuler(data.quaternion);
+
+      if (!historyRef.current[entry.deviceKey]) {
+        historyRef.current[entry.deviceKey] = createDeviceHistory();
       }
+      recordHistory(historyRef.current[entry.deviceKey], data, entry.euler, entry.timestamp);
+    });
 
-      return {
-        ...prevDevices,
-        [deviceKey]: updatedDevice
-      };
+    setDevices(prevDevices => {
+      const updatedDevices = { ...prevDevices };
+      const copiedKeys = new Set();
+      batch.forEach(({ deviceKey, message, timestamp, euler }) => {
+        // Copy each device once per batch; later messages in the same batch
+        // update that copy in place instead of copying it again
+        if (!copiedKeys.has(deviceKey)) {
+          const prevDevice = prevDevices[deviceKey];
+          updatedDevices[deviceKey] = prevDevice
+            ? { ...prevDevice }
+            : createDevice(message, timestamp, historyRef.current[deviceKey]);
+          copiedKeys.add(deviceKey);
+        }
+        applyIMUData(updatedDevices[deviceKey], message, timestamp, euler);
+      });
+      return updatedDevices;
     });
 
     // Update stats
-    setStats(prevStats => ({
-      ...prevStats,
-      [deviceType]: (prevStats[deviceType] || 0) + 1
-    }));
+    const counts = {};
+    batch.forEach(({ message }) => {
+      counts[message.deviceType] = (counts[message.deviceType] || 0) + 1;
+    });
+    setStats(prevStats => {
+      const updatedStats = { ...prevStats };
+      Object.keys(counts).forEach(deviceType => {
+        updatedStats[deviceType] = (updatedStats[deviceType] || 0) + counts[deviceType];
+      });
+      return updatedStats;
+    });
+  };
+
+  const recordHistory = (history, data, euler, timestamp) => {
+    const addToHistory = (buffer, newData) => {
+      if (newData) {
+        buffer.push(timestamp, newData);
+      }
+    };
+
+    // Always track raw data
+    addToHistory(history.accelerometerHistory, data.accelerometer);
+    addToHistory(history.eulerHistory, euler);
+    addToHistory(history.quaternionHistory, data.quaternion);
+    
+    // Track linear acceleration for AR glasses
+    addToHistory(history.linearAccelerationHistory, data.linear_acceleration);
+    
+    // Only add gyroscope data to history if the device has a gyroscope
+    if (data.has_gyro) {
+      addToHistory(history.gyroscopeHistory, data.gyroscope);
+    }
+    
+    // Track world frame data if available from server
+    addToHistory(history.worldFrameAccelerometerHistory, data.worldFrameAccelerometer);
+    addToHistory(history.worldFrameQuaternionHistory, data.worldFrameQuaternion);
+    addToHistory(history.worldFrameEulerHistory, data.worldFrameEuler);
+    addToHistory(history.worldFrameLinearAccelerationHistory, data.worldFrameLinearAcceleration);
+  };
+
+  const createDevice = (message, timestamp, history) => {
+    const { deviceType, data, clientIP } = message;
+
+    return {
+      device_id: data.device_id,
+      device_name: data.device_name,
+      device_type: data.device_type || deviceType,
+      clientIP: clientIP,
+      isActive: true,
+      lastUpdate: timestamp,
+      sampleCount: 0,
+      frequency: 0,
+      sampleIntervalEma: 0, // Moving average of the time between samples (ms)
+      ...history
+    };
+  };
+
+  // Updates a device object created for the current batch in place
+  const applyIMUData = (updatedDevice, message, timestamp, euler) => {
+    const { data, clientIP } = message;
+
+    // Update the sample rate from an exponential moving average of the
+    // interval since the previous sample
+    if (updatedDevice.sampleCount > 0) {
+      const interval = timestamp - updatedDevice.lastUpdate;
+      updatedDevice.sampleIntervalEma = updatedDevice.sampleCount === 1
+        ? interval
+        : updatedDevice.sampleIntervalEma + FREQUENCY_EMA_ALPHA * (interval - updatedDevice.sampleIntervalEma);
+      if (updatedDevice.sampleIntervalEma > 0) {
+        updatedDevice.frequency = Math.round(1000 / updatedDevice.sampleIntervalEma);
+      }
+    }
+
+    // Update device data with all data from server (including world frame if present)
+    Object.assign(updatedDevice, {
+      // Raw data
+      accelerometer: data.accelerometer,
+      quaternion: data.quaternion,
+      euler: euler,
+      has_gyro: !!data.has_gyro,
+      
+      // World frame data (if server calculated it)
+      worldFrameQuaternion: data.worldFrameQuaternion,
+      worldFrameQuatForViz: data.worldFrameQuatForViz,
+      worldFrameAccelerometer: data.worldFrameAccelerometer,
+      worldFrameEuler: data.worldFrameEuler,
+      worldFrameLinearAcceleration: data.worldFrameLinearAcceleration,
+      isCalibrated: !!data.isCalibrated,
+      
+      // Metadata
+      lastUpdate: timestamp,
+      sampleCount: updatedDevice.sampleCount + 1,
+      isActive: true,
+      clientIP: clientIP
+    });
+    
+    // Handle gyroscope data if available
+    if (data.has_gyro) {
+      updatedDevice.gyroscope = data.gyroscope || [0, 0, 0];
+    }
+    
+    // Handle linear acceleration data for AR glasses
+    if (data.linear_acceleration) {
+      updatedDevice.linear_acceleration = data.linear_acceleration;
+    }
   };
 
   // Handle calibration completion - send to server
@@ -344,26 +434,34 @@ function App() {
   // Clean up inactive devices
   useEffect(() => {
     const interval = setInterval(() => {
-      const now = Date.now();
+      const now = performance.now();
       setDevices(prevDevices => {
-        const updated = { ...prevDevices };
-        let hasChanges = false;
-
-        Object.keys(updated).forEach(deviceKey => {
-          if (now - updated[deviceKey].lastUpdate > 5000) { // 5 seconds timeout
-            updated[deviceKey].isActive = false;
-            hasChanges = true;
+        let updated = null;
+
+        Object.keys(prevDevices).forEach(deviceKey => {
+          const device = prevDevices[deviceKey];
+          // Only devices still marked active can change, so once every stale
+          // device is inactive the state is left untouched (no re-render)
+          if (device.isActive && now - device.lastUpdate > 5000) { // 5 seconds timeout
+            if (!updated) {
+              updated = { ...prevDevices };
+            }
+            updated[deviceKey] = { ...device, isActive: false };
           }
         });
 
-        return hasChanges ? updated : prevDevices;
+        return updated || prevDevices;
       });
     }, 1000);
 
     return () => clearInterval(interval);
   }, []);
 
-  const activeDevices = Object.values(devices).filter(device => device.isActive);
+  // Filter active devices once per devices update and share with child components
+  const activeDevices = useMemo(
+    () => Object.values(devices).filter(device => device.isActive),
+    [devices]
+  );
   const deviceCount = activeDevices.length;
 
   return (
@@ -380,7 +478,7 @@ function App() {
         {/* 3D Scene */}
         <div className={`scene-container ${showOverlay ? 'with-overlay' : 'full-width'}`}>
           <ThreeJSScene 
-            devices={devices}
+            activeDevices={activeDevices}
             selectedDevice={selectedDevice}
             onDeviceSelect={setSelectedDevice}
             calibrationParams={calibrationParams}
@@ -402,7 +500,7 @@ function App() {
         {showOverlay && (
           <div className="overlay-container">
             <IMUOverlay 
-              devices={devices}
+              activeDevices={activeDevices}
               selectedDevice={selectedDevice}
               onDeviceSelect={setSelectedDevice}
               connectionStatus={connectionStatus}
@@ -2,6 +2,7 @@
 import { useState, useRef } from 'react';
 import { 
   calculateAverageQuaternion, 
+  calculateAverageQuaternionFromBuffer,
   quaternionToRotationMatrix,
   transposeMatrix,
   matrixMultiply
@@ -22,13 +23,18 @@ const CalibrationPanel = ({
   const [countdown, setCountdown] = useState(3);
   const [progress, setProgress] = useState(0);
   
-  // Collected samples
-  const samplesRef = useRef([]);
-  const tposeSamplesRef = useRef({});
   const calibrationDuration = 3; // seconds
   const samplingRate = 30; // Hz
   const samplesToCollect = calibrationDuration * samplingRate;
   
+  // Collected samples (device quaternions packed as float32 [x, y, z, w])
+  const samplesRef = useRef({
+    quaternions: new Float32Array(samplesToCollect * 4),
+    count: 0
+  });
+  const tposeSamplesRef = useRef({});
+  const sampleIntervalRef = useRef(null);
+  
   // Handle world frame alignment
   const startWorldFrameCalibration = () => {
     if (!selectedDevice) return;
@@ -37,7 +43,7 @@ const CalibrationPanel = ({
     
     setCalibrationStep('worldFrame');
     setCountdown(3);
-    samplesRef.current = [];
+    samplesRef.current.count = 0;
     
     // Start countdown
     const countdownInterval = setInterval(() => {
@@ -77,13 +83,20 @@ const CalibrationPanel = ({
   const collectWorldFrameSamples = () => {
     setCalibrationStep('inProgress');
     setProgress(0);
-    let sampleCount = 0;
+    
+    // Only one collection may fill the shared buffer at a time
+    if (sampleIntervalRef.current !== null) {
+      clearInterval(sampleIntervalRef.current);
+    }
+    const samples = samplesRef.current;
+    samples.count = 0;
     
     console.log('Starting world frame sample collection');
     
-    const sampleInterval = setInterval(() => {
-      if (sampleCount >= samplesToCollect) {
-        clearInterval(sampleInterval);
+    sampleIntervalRef.current = setInterval(() => {
+      if (samples.count >= samplesToCollect) {
+        clearInterval(sampleIntervalRef.current);
+        sampleIntervalRef.current = null;
         processWorldFrameSamples();
         return;
       }
@@ -93,13 +106,9 @@ const CalibrationPanel = ({
         const deviceData = devices[selectedDevice];
         
         if (deviceData.quaternion && deviceData.accelerometer) {
-          samplesRef.current.push({
-            quaternion: [...deviceData.quaternion],
-            accelerometer: [...deviceData.accelerometer]
-          });
-          
-          sampleCount++;
-          setProgress((sampleCount / samplesToCollect) * 100);
+          samples.quaternions.set(deviceData.quaternion, samples.count * 4);
+          samples.count++;
+          setProgress((samples.count / samplesToCollect) * 100);
         }
       }
     }, 1000 / samplingRate);
@@ -127,9 +136,11 @@ const CalibrationPanel = ({
             tposeSamplesRef.current[deviceKey] = [];
           }
           
+          // Each IMU message brings fresh arrays that are never mutated,
+          // so samples can hold them without copying
           tposeSamplesRef.current[deviceKey].push({
-            quaternion: [...deviceData.quaternion],
-            worldFrameQuaternion: [...deviceData.worldFrameQuaternion]
+            quaternion: deviceData.quaternion,
+            worldFrameQuaternion: deviceData.worldFrameQuaternion
           });
         }
       });
@@ -141,11 +152,11 @@ const CalibrationPanel = ({
   
   // Process collected world frame samples
   const processWorldFrameSamples = () => {
-    const samples = samplesRef.current;
+    const { quaternions, count } = samplesRef.current;
     
-    console.log(`Processing ${samples.length} samples for world frame calibration`);
+    console.log(`Processing ${count} samples for world frame calibration`);
     
-    if (samples.length === 0) {
+    if (count === 0) {
       console.error('No samples collected for calibration!');
       setCalibrationStep('idle');
       return;
@@ -153,9 +164,7 @@ const CalibrationPanel = ({
     
     try {
       // Calculate average quaternion from samples
-      const avgQuaternion = calculateAverageQuaternion(
-        samples.map(s => s.quaternion)
-      );
+      const avgQuaternion = calculateAverageQuaternionFromBuffer(quaternions, count);
       
       // Convert to rotation matrix
       const rotationMatrix = quaternionToRotationMatrix(avgQuaternion);
@@ -236,7 +245,7 @@ const CalibrationPanel = ({
   const resetCalibration = () => {
     setCalibrationStep('idle');
     setProgress(0);
-    samplesRef.current = [];
+    samplesRef.current.count = 0;
     tposeSamplesRef.current = {};
     
     if (onCalibrationReset) {
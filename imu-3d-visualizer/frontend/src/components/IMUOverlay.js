@@ -14,6 +14,7 @@ import {
 
 // Constants
 const WAVEFORM_SAMPLES = 50;
+const ZERO_VECTOR = [0, 0, 0];
 const AXIS_COLORS = {
   x: '#ef4444',
   y: '#22c55e', 
@@ -50,14 +51,16 @@ const Waveform = ({ data, dataKeys, colors, height = 100 }) => {
     );
   }
 
-  // Prepare chart data
-  const chartData = data.slice(-WAVEFORM_SAMPLES).map((item, index) => {
-    const dataPoint = { time: index };
+  // Prepare chart data from the most recent samples of the history buffer
+  const start = Math.max(0, data.length - WAVEFORM_SAMPLES);
+  const chartData = [];
+  for (let i = start; i < data.length; i++) {
+    const dataPoint = { time: i - start };
     dataKeys.forEach((key, keyIndex) => {
-      dataPoint[key] = item.data[keyIndex] || 0;
+      dataPoint[key] = data.valueAt(i, keyIndex) || 0;
     });
-    return dataPoint;
-  });
+    chartData.push(dataPoint);
+  }
 
   return (
     <div className="waveform-container" style={{ height }}>
@@ -156,7 +159,7 @@ const RotationSection = ({ title, euler, isWorldFrame = false }) => {
 // Device Card Component
 const DeviceCard = ({ device, isSelected, onSelect, calibrationParams }) => {
   const deviceKey = `${device.device_name}_${device.device_id}`;
-  const timeSinceUpdate = Date.now() - device.lastUpdate;
+  const timeSinceUpdate = performance.now() - device.lastUpdate;
   const isOnline = timeSinceUpdate < 3000;
   
   // Device capabilities
@@ -203,7 +206,7 @@ const DeviceCard = ({ device, isSelected, onSelect, calibrationParams }) => {
       {/* Acceleration Sections */}
       <SensorSection
         title="Raw Acceleration (m/s²)"
-        values={device.accelerometer || [0, 0, 0]}
+        values={device.accelerometer || ZERO_VECTOR}
         history={device.accelerometerHistory}
         showWaveform={true}
       />
@@ -258,7 +261,7 @@ const DeviceCard = ({ device, isSelected, onSelect, calibrationParams }) => {
       {hasGyro && (
         <SensorSection
           title="Gyroscope (rad/s)"
-          values={device.gyroscope || [0, 0, 0]}
+          values={device.gyroscope || ZERO_VECTOR}
           history={device.gyroscopeHistory}
           showWaveform={true}
         />
@@ -281,14 +284,13 @@ const EmptyState = () => (
 
 // Main IMU Overlay Component
 const IMUOverlay = ({ 
-  devices, 
+  activeDevices, 
   selectedDevice, 
   onDeviceSelect, 
   connectionStatus,
   stats,
   calibrationParams
 }) => {
-  const activeDevices = Object.values(devices).filter(device => device.isActive);
   const isCalibrated = !!calibrationParams?.isCalibrated;
 
   return (
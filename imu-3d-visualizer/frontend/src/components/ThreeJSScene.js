@@ -1,6 +1,6 @@
 // ThreeJSScene.js - Updated with simplified quaternion handling
 import React, { useRef, useEffect, useState } from 'react';
-import { Canvas, useFrame, useThree } from '@react-three/fiber';
+import { Canvas, useThree } from '@react-three/fiber';
 import { OrbitControls, Grid, Text, Box, Sphere, Cylinder } from '@react-three/drei';
 
 // World Coordinate System Axes
@@ -79,25 +79,39 @@ function DeviceLocalFrame({ scale = 0.5 }) {
   );
 }
 
+// Device Orientation Hook
+// Copies the latest device quaternion onto the mesh and requests a render.
+// Every packet arrives as a new array, so the effect only runs when there is
+// a new orientation to apply; with the on-demand frame loop, nothing is
+// redrawn while devices and camera are still.
+function useDeviceOrientation(meshRef, device, calibrationParams) {
+  const invalidate = useThree(state => state.invalidate);
+
+  // After calibration, use the world frame quaternion directly
+  const useWorldFrame = !!(calibrationParams?.isCalibrated && device?.worldFrameQuatForViz);
+  const source = useWorldFrame ? device.worldFrameQuatForViz : device?.quaternion;
+
+  useEffect(() => {
+    if (!meshRef.current || !source) {
+      return;
+    }
+
+    const [x, y, z, w] = source;
+    if (useWorldFrame) {
+      meshRef.current.quaternion.set(x, y, z, w);
+    } else {
+      // Before calibration: apply device-specific transform
+      // Phone identity = laying flat, we need to rotate it for proper visualization
+      meshRef.current.quaternion.set(-x, z, y, w);
+    }
+    invalidate();
+  }, [meshRef, source, useWorldFrame, invalidate]);
+}
+
 // Phone Model
 function PhoneModel({ position, device, isSelected, onClick, calibrationParams }) {
   const meshRef = useRef();
-  
-  useFrame(() => {
-    if (meshRef.current && device) {
-      // After calibration, use the world frame quaternion directly
-      if (calibrationParams?.isCalibrated && device.worldFrameQuatForViz) {
-        const [x, y, z, w] = device.worldFrameQuatForViz;
-        meshRef.current.quaternion.set(x, y, z, w);
-      
-      } else if (device.quaternion) {
-        // Before calibration: apply device-specific transform
-        // Phone identity = laying flat, we need to rotate it for proper visualization
-        const [x, y, z, w] = device.quaternion;
-        meshRef.current.quaternion.set(-x, z, y, w);
-      }
-    }
-  });
+  useDeviceOrientation(meshRef, device, calibrationParams);
 
   return (
     <group position={position} onClick={onClick}>
@@ -142,20 +156,7 @@ function PhoneModel({ position, device, isSelected, onClick, calibrationParams }
 // Simplified Watch Model
 function WatchModel({ position, device, isSelected, onClick, calibrationParams }) {
   const meshRef = useRef();
-  
-  useFrame(() => {
-    if (meshRef.current && device) {
-      // After calibration, use the world frame quaternion directly
-      if (calibrationParams?.isCalibrated && device.worldFrameQuatForViz) {
-        const [x, y, z, w] = device.worldFrameQuatForViz;
-        meshRef.current.quaternion.set(x, y, z, w);
-      } else if (device.quaternion) {
-        // Before calibration: apply device-specific transform
-        const [x, y, z, w] = device.quaternion;
-        meshRef.current.quaternion.set(-x, z, y, w);
-      }
-    }
-  });
+  useDeviceOrientation(meshRef, device, calibrationParams);
 
   return (
     <group position={position} onClick={onClick}>
@@ -200,20 +201,7 @@ function WatchModel({ position, device, isSelected, onClick, calibrationParams }
 // Simplified Headphone/Glasses Model
 function HeadphoneModel({ position, device, isSelected, onClick, calibrationParams }) {
   const meshRef = useRef();
-
-    useFrame(() => {
-    if (meshRef.current && device) {
-      // After calibration, use the world frame quaternion directly
-      if (calibrationParams?.isCalibrated && device.worldFrameQuatForViz) {
-        const [x, y, z, w] = device.worldFrameQuatForViz;
-        meshRef.current.quaternion.set(x, y, z, w);
-      } else if (device.quaternion) {
-        // Before calibration: apply device-specific transform
-        const [x, y, z, w] = device.quaternion;
-        meshRef.current.quaternion.set(-x, z, y, w);
-      }
-    }
-  });
+  useDeviceOrientation(meshRef, device, calibrationParams);
 
   const isGlasses = device.device_name === 'glasses' || device.device_name === 'headphone';
   const color = isSelected ? '#8b5cf6' : '#6b7280';
@@ -253,34 +241,36 @@ function HeadphoneModel({ position, device, isSelected, onClick, calibrationPara
   );
 }
 
+// Fixed device positions in 3D space, built once rather than on every
+// scene render (the scene re-renders with each batch of device updates)
+const DEVICE_POSITIONS = new Map([
+  ['phone', [3, 0, 0]],
+  ['watch', [0, 0, 0]],
+  ['headphone', [-3, 0, 0]],
+  ['glasses', [-3, 0, 0]]
+]);
+
 // Helper function to get device position in 3D space
 function getDevicePosition(deviceName, deviceId) {
-  const positions = {
-    'phone': [3, 0, 0],
-    'watch': [0, 0, 0], 
-    'headphone': [-3, 0, 0],
-    'glasses': [-3, 0, 0]
-  };
-  
-  return positions[deviceName] || [deviceId * 2 - 3, 0, 0];
+  return DEVICE_POSITIONS.get(deviceName) || [deviceId * 2 - 3, 0, 0];
 }
 
 // Camera Controls Component
 function CameraController() {
-  const { camera } = useThree();
+  const { camera, invalidate } = useThree();
   
   useEffect(() => {
     camera.position.set(2, 6, -10);
     camera.lookAt(0, 0, 0);
-  }, [camera]);
+    invalidate();
+  }, [camera, invalidate]);
 
   return null;
 }
 
 // Main Scene Component
-function Scene({ devices, selectedDevice, onDeviceSelect, calibrationParams }) {
+function Scene({ activeDevices, selectedDevice, onDeviceSelect, calibrationParams }) {
   const [showAxes] = useState(true);
-  const activeDevices = Object.values(devices).filter(device => device.isActive);
 
   const handleDeviceClick = (deviceKey) => {
     onDeviceSelect(selectedDevice === deviceKey ? null : deviceKey);
@@ -390,15 +380,18 @@ function Scene({ devices, selectedDevice, onDeviceSelect, calibrationParams }) {
 }
 
 // Main ThreeJS Scene Component
-export default function ThreeJSScene({ devices, selectedDevice, onDeviceSelect, calibrationParams }) {
+export default function ThreeJSScene({ activeDevices, selectedDevice, onDeviceSelect, calibrationParams }) {
   return (
     <div style={{ width: '100%', height: '100%' }}>
+      {/* Render on demand: frames are requested by new device orientations,
+          camera controls and scene changes instead of running continuously */}
       <Canvas
+        frameloop="demand"
         camera={{ position: [8, 6, -8], fov: 60 }}
         style={{ background: '#111827' }}
       >
         <Scene 
-          devices={devices}
+          activeDevices={activeDevices}
           selectedDevice={selectedDevice}
           onDeviceSelect={onDeviceSelect}
           calibrationParams={calibrationParams}
@@ -0,0 +1,72 @@
+// historyBuffer.js - Fixed-capacity ring buffer for sensor sample history
+
+/**
+ * Ring buffer of timestamped sensor samples
+ * Samples are stored in preallocated typed arrays, so pushing a sample
+ * overwrites the oldest one instead of copying the whole history
+ */
+export class HistoryBuffer {
+  /**
+   * @param {number} capacity - Maximum number of samples kept (rounded up to a
+   *   power of two so slots can be computed with a bitmask instead of modulo)
+   * @param {number} components - Values per sample (3 for vectors, 4 for quaternions)
+   */
+  constructor(capacity, components = 3) {
+    let size = 1;
+    while (size < capacity) {
+      size *= 2;
+    }
+
+    this.capacity = size;
+    this.mask = size - 1;
+    this.components = components;
+    this.timestamps = new Float64Array(size);
+    this.values = new Float32Array(size * components);
+    this.head = 0; // Next write position
+    this.length = 0;
+  }
+
+  /**
+   * Append a sample, overwriting the oldest one when full
+   * @param {number} timestamp - Sample timestamp (ms)
+   * @param {Array} sample - Sample values
+   */
+  push(timestamp, sample) {
+    const offset = this.head * this.components;
+    for (let i = 0; i < this.components; i++) {
+      this.values[offset + i] = sample[i] || 0;
+    }
+    this.timestamps[this.head] = timestamp;
+
+    this.head = (this.head + 1) & this.mask;
+    if (this.length < this.capacity) {
+      this.length++;
+    }
+  }
+
+  /**
+   * Map a logical index (0 = oldest sample) to a storage slot
+   * @param {number} index - Logical sample index
+   * @returns {number} Storage slot
+   */
+  slot(index) {
+    return (this.head - this.length + index) & this.mask;
+  }
+
+  /**
+   * @param {number} index - Logical sample index (0 = oldest)
+   * @returns {number} Sample timestamp
+   */
+  timestampAt(index) {
+    return this.timestamps[this.slot(index)];
+  }
+
+  /**
+   * @param {number} index - Logical sample index (0 = oldest)
+   * @param {number} component - Component within the sample
+   * @returns {number} Sample value
+   */
+  valueAt(index, component) {
+    return this.values[this.slot(index) * this.components + component];
+  }
+}
@@ -1,5 +1,6 @@
 // mathUtils.js - A utility file for quaternion and matrix operations
-import * as math from 'mathjs';
+
+const RAD_TO_DEG = 180 / Math.PI;
 
 /**
  * Converts a quaternion [x, y, z, w] to a 3x3 rotation matrix
@@ -69,13 +70,18 @@ export const rotationMatrixToQuaternion = (m) => {
 };
 
 /**
- * Multiplies two matrices using math.js
+ * Multiplies two matrices
  * @param {Array} a - First matrix
- * @param {Array} b - Second matrix
- * @returns {Array} Result matrix
+ * @param {Array} b - Second matrix (or a vector)
+ * @returns {Array} Result matrix (or vector)
  */
 export const matrixMultiply = (a, b) => {
-  return math.multiply(a, b);
+  if (!Array.isArray(b[0])) {
+    return matrixVectorMultiply(a, b);
+  }
+  return a.map(row =>
+    b[0].map((_, j) => row.reduce((sum, value, k) => sum + value * b[k][j], 0))
+  );
 };
 
 /**
@@ -85,7 +91,7 @@ export const matrixMultiply = (a, b) => {
  * @returns {Array} Result vector
  */
 export const matrixVectorMultiply = (m, v) => {
-  return math.multiply(m, v);
+  return m.map(row => row.reduce((sum, value, k) => sum + value * v[k], 0));
 };
 
 /**
@@ -94,7 +100,7 @@ export const matrixVectorMultiply = (m, v) => {
  * @returns {Array} Transposed matrix
  */
 export const transposeMatrix = (m) => {
-  return math.transpose(m);
+  return m[0].map((_, j) => m.map(row => row[j]));
 };
 
 /**
@@ -184,7 +190,7 @@ export const quaternionToEuler = (quaternion) => {
   // Roll (x-axis rotation)
   const sinr_cosp = 2 * (w * x + y * z);
   const cosr_cosp = 1 - 2 * (x * x + y * y);
-  const roll = Math.atan2(sinr_cosp, cosr_cosp) * 180 / Math.PI;
+  const roll = Math.atan2(sinr_cosp, cosr_cosp) * RAD_TO_DEG;
 
   // Pitch (y-axis rotation)
   const sinp = 2 * (w * y - z * x);
@@ -192,13 +198,13 @@ export const quaternionToEuler = (quaternion) => {
   if (Math.abs(sinp) >= 1) {
     pitch = Math.sign(sinp) * 90; // Use 90 degrees if out of range
   } else {
-    pitch = Math.asin(sinp) * 180 / Math.PI;
+    pitch = Math.asin(sinp) * RAD_TO_DEG;
   }
 
   // Yaw (z-axis rotation)
   const siny_cosp = 2 * (w * z + x * y);
   const cosy_cosp = 1 - 2 * (y * y + z * z);
-  const yaw = Math.atan2(siny_cosp, cosy_cosp) * 180 / Math.PI;
+  const yaw = Math.atan2(siny_cosp, cosy_cosp) * RAD_TO_DEG;
 
   return [roll, pitch, yaw];
 };
@@ -227,6 +233,30 @@ export const calculateAverageQuaternion = (quaternions) => {
   return normalizeQuaternion(sum);
 };
 
+/**
+ * Calculates the average of quaternions packed in a flat array
+ * @param {Float32Array} buffer - Quaternions stored consecutively as [x, y, z, w]
+ * @param {number} count - Number of quaternions in the buffer
+ * @returns {Array} Average quaternion, normalized
+ */
+export const calculateAverageQuaternionFromBuffer = (buffer, count) => {
+  if (count === 0) return [0, 0, 0, 1];
+  
+  const sum = [0, 0, 0, 0];
+  
+  for (let i = 0; i < count * 4; i += 4) {
+    // Ensure quaternion is in the same hemisphere for better averaging
+    const signCorrection = buffer[i + 3] < 0 ? -1 : 1;
+    
+    sum[0] += buffer[i] * signCorrection;
+    sum[1] += buffer[i + 1] * signCorrection;
+    sum[2] += buffer[i + 2] * signCorrection;
+    sum[3] += buffer[i + 3] * signCorrection;
+  }
+  
+  return normalizeQuaternion(sum);
+};
+
 /**
  * Creates an identity quaternion
  * @returns {Array} Identity quaternion [0, 0, 0, 1]